@@ -1,12 +1,21 @@
 """Image preprocessing module for AWS Textract Number Plate Extractor"""
 
+from __future__ import annotations
+
+import mmap
 import os
-from pathlib import Path
-from typing import Tuple
-from PIL import Image
+import stat
+import threading
+from typing import Optional, Tuple, Union
 import cv2
 import numpy as np
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _TURBO_JPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # PyTurboJPEG or libturbojpeg not installed
+    _TURBO_JPEG = None
+
 
 class ImagePreprocessor:
     """Handles image loading, validation, and preprocessing"""
@@ -14,12 +23,53 @@ class ImagePreprocessor:
     # Maximum file size for Textract (5 MB)
     MAX_FILE_SIZE = 5 * 1024 * 1024
     
-    # Supported image formats
-    SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
+    # Supported image formats (extensions without the leading dot)
+    SUPPORTED_FORMATS = frozenset({'jpg', 'jpeg', 'png', 'bmp', 'gif', 'webp'})
+    
+    # Skip enhancement for JPEGs that are already well compressed and small:
+    # at least this many bytes per pixel ...
+    SKIP_ENHANCE_MIN_BYTES_PER_PIXEL = 0.5
+    # ... and at most this many pixels
+    SKIP_ENHANCE_MAX_PIXELS = 2_000_000
+    
+    # Long-edge limit for enhancement; Textract reads plates fine at this size
+    MAX_ENHANCE_DIMENSION = 1600
+    
+    # JPEG quality for the re-encoded (enhanced) image
+    JPEG_QUALITY = 85
+    
+    # CLAHE parameters (contrast enhancement)
+    CLAHE_CLIP_LIMIT = 3.0
+    CLAHE_TILE_GRID = (8, 8)
+    
+    # Guided filter parameters (noise reduction); radius 4 is a 9x9 window
+    GUIDED_FILTER_RADIUS = 4
+    GUIDED_FILTER_EPS = 25 * 25
+    
+    # Bump when preprocess_image's output changes in a way the settings
+    # covered by pipeline_signature() don't capture
+    PIPELINE_VERSION = 1
+    
+    # Per-thread cache of the CLAHE object: creating one allocates its LUTs,
+    # and an instance keeps scratch buffers so threads cannot share it
+    _thread_state = threading.local()
+    
+    # JPEG start-of-frame markers (SOF0-SOF15 except DHT, JPG and DAC)
+    _JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
     
     def __init__(self):
         pass
     
+    @staticmethod
+    def _get_clahe() -> cv2.CLAHE:
+        """Return the calling thread's cached CLAHE instance"""
+        clahe = getattr(ImagePreprocessor._thread_state, 'clahe', None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=ImagePreprocessor.CLAHE_CLIP_LIMIT,
+                                    tileGridSize=ImagePreprocessor.CLAHE_TILE_GRID)
+            ImagePreprocessor._thread_state.clahe = clahe
+        return clahe
+    
     @staticmethod
     def validate_image_file(image_path: str) -> Tuple[bool, str]:
         """
@@ -31,19 +81,24 @@ class ImagePreprocessor:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not os.path.exists(image_path):
+        # A single stat() answers existence, type and size
+        try:
+            st = os.stat(image_path)
+        except OSError:
             return False, f"File not found: {image_path}"
         
-        if not os.path.isfile(image_path):
+        if not stat.S_ISREG(st.st_mode):
             return False, f"Path is not a file: {image_path}"
         
         # Check file extension
-        file_ext = Path(image_path).suffix.lower()
+        stem, dot, file_ext = os.path.basename(image_path).rpartition('.')
+        file_ext = file_ext.lower() if stem and dot else ''
         if file_ext not in ImagePreprocessor.SUPPORTED_FORMATS:
-            return False, f"Unsupported format: {file_ext}. Supported: {', '.join(ImagePreprocessor.SUPPORTED_FORMATS)}"
+            supported = ', '.join('.' + ext for ext in sorted(ImagePreprocessor.SUPPORTED_FORMATS))
+            return False, f"Unsupported format: .{file_ext}. Supported: {supported}"
         
         # Check file size
-        file_size = os.path.getsize(image_path)
+        file_size = st.st_size
         if file_size > ImagePreprocessor.MAX_FILE_SIZE:
             return False, f"File size {file_size / (1024*1024):.2f} MB exceeds maximum {ImagePreprocessor.MAX_FILE_SIZE / (1024*1024)} MB"
         
@@ -72,6 +127,30 @@ class ImagePreprocessor:
         except IOError as e:
             raise IOError(f"Failed to read image file {image_path}: {str(e)}")
     
+    @staticmethod
+    def map_image_file(image_path: str) -> mmap.mmap:
+        """
+        Memory-map an image file read-only
+        
+        The mapping is bytes-like and can be sent to Textract as-is, avoiding
+        a full copy of the file. Close it (or use it as a context manager)
+        once it is no longer needed.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Read-only mmap of the file contents
+            
+        Raises:
+            IOError: If file cannot be mapped
+        """
+        try:
+            with open(image_path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise IOError(f"Failed to read image file {image_path}: {str(e)}")
+    
     @staticmethod
     def load_image_with_pillow(image_path: str) -> Image.Image:
         """
@@ -86,6 +165,8 @@ class ImagePreprocessor:
         Raises:
             IOError: If image cannot be opened
         """
+        from PIL import Image  # only needed for this fallback loader
+        
         try:
             img = Image.open(image_path)
             return img
@@ -106,11 +187,114 @@ class ImagePreprocessor:
         Raises:
             IOError: If image cannot be loaded
         """
-        img = cv2.imread(image_path)
+        # Decode straight from a read-only mapping of the file; avoids the
+        # extra userspace buffer cv2.imread reads into
+        try:
+            with open(image_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                img = cv2.imdecode(np.frombuffer(mm, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except (OSError, ValueError) as e:
+            raise IOError(f"Failed to load image with OpenCV: {image_path}: {str(e)}")
         if img is None:
             raise IOError(f"Failed to load image with OpenCV: {image_path}")
         return img
     
+    @staticmethod
+    def read_jpeg_dimensions(image_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Read JPEG dimensions from the start-of-frame header without decoding
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (width, height), or None if the file is not a parseable JPEG
+        """
+        try:
+            with open(image_path, 'rb') as f:
+                if f.read(2) != b'\xff\xd8':
+                    return None
+                while True:
+                    byte = f.read(1)
+                    if not byte:
+                        return None
+                    if byte != b'\xff':
+                        continue
+                    # Skip fill bytes between markers
+                    marker = f.read(1)
+                    while marker == b'\xff':
+                        marker = f.read(1)
+                    if not marker:
+                        return None
+                    code = marker[0]
+                    # Standalone markers carry no length field
+                    if code == 0x01 or 0xD0 <= code <= 0xD8:
+                        continue
+                    length_bytes = f.read(2)
+                    if len(length_bytes) < 2:
+                        return None
+                    length = int.from_bytes(length_bytes, 'big')
+                    if code in ImagePreprocessor._JPEG_SOF_MARKERS:
+                        frame = f.read(5)
+                        if len(frame) < 5:
+                            return None
+                        height = int.from_bytes(frame[1:3], 'big')
+                        width = int.from_bytes(frame[3:5], 'big')
+                        return width, height
+                    if code == 0xDA:  # Start of scan: no frame header found
+                        return None
+                    f.seek(length - 2, os.SEEK_CUR)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def read_png_dimensions(image_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Read PNG dimensions from the IHDR chunk without decoding
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (width, height), or None if the file is not a PNG
+        """
+        try:
+            with open(image_path, 'rb') as f:
+                header = f.read(24)
+        except OSError:
+            return None
+        # 8-byte signature, then the IHDR chunk (length, type, width, height)
+        if len(header) < 24 or header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+            return None
+        width = int.from_bytes(header[16:20], 'big')
+        height = int.from_bytes(header[20:24], 'big')
+        return width, height
+    
+    @staticmethod
+    def needs_enhancement(image_path: str) -> bool:
+        """
+        Decide whether enhancement is worth running for an image
+        
+        Small JPEGs with a high bytes-per-pixel ratio are already clean enough
+        for Textract, so the decode/filter/re-encode pipeline is skipped.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            True if the image should go through the enhancement pipeline
+        """
+        dimensions = ImagePreprocessor.read_jpeg_dimensions(image_path)
+        if dimensions is None:
+            return True
+        
+        pixels = dimensions[0] * dimensions[1]
+        if pixels == 0 or pixels > ImagePreprocessor.SKIP_ENHANCE_MAX_PIXELS:
+            return True
+        
+        bytes_per_pixel = os.path.getsize(image_path) / pixels
+        return bytes_per_pixel <= ImagePreprocessor.SKIP_ENHANCE_MIN_BYTES_PER_PIXEL
+    
     @staticmethod
     def crop_roi(image_cv: np.ndarray, roi: Tuple[int, int, int, int]) -> np.ndarray:
         """
@@ -137,19 +321,33 @@ class ImagePreprocessor:
         Returns:
             Enhanced image
         """
-        # Convert to LAB color space
-        lab = cv2.cvtColor(image_cv, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        # Convert to YCrCb (linear transform, cheaper than LAB)
+        ycrcb = cv2.cvtColor(image_cv, cv2.COLOR_BGR2YCrCb)
         
-        # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
+        # Apply CLAHE to the luma channel only, writing it back in place
+        y = cv2.extractChannel(ycrcb, 0)
+        ImagePreprocessor._get_clahe().apply(y, dst=y)
+        cv2.insertChannel(y, ycrcb, 0)
         
-        # Merge channels back
-        lab = cv2.merge([l, a, b])
-        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+    
+    @staticmethod
+    def downscale_to_max_dimension(image_cv: np.ndarray, max_dimension: int) -> np.ndarray:
+        """
+        Shrink an image so its longer edge is at most max_dimension pixels
         
-        return enhanced
+        Args:
+            image_cv: OpenCV image as numpy array
+            max_dimension: Maximum length of the longer edge
+            
+        Returns:
+            Downscaled image, or the input unchanged if it already fits
+        """
+        h, w = image_cv.shape[:2]
+        scale = min(1.0, max_dimension / max(h, w))
+        if scale >= 1.0:
+            return image_cv
+        return cv2.resize(image_cv, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     
     @staticmethod
     def convert_to_grayscale(image_cv: np.ndarray) -> np.ndarray:
@@ -175,8 +373,42 @@ class ImagePreprocessor:
         Returns:
             Filtered image
         """
-        return cv2.bilateralFilter(image_cv, 9, 75, 75)
-    
+        return ImagePreprocessor.apply_guided_filter(image_cv,
+                                                     radius=ImagePreprocessor.GUIDED_FILTER_RADIUS,
+                                                     eps=ImagePreprocessor.GUIDED_FILTER_EPS)
+
+    @staticmethod
+    def apply_guided_filter(image_cv: np.ndarray, radius: int = 4, eps: float = 25 * 25) -> np.ndarray:
+        """
+        Edge-preserving smoothing with a self-guided filter (He et al.)
+
+        Built from box filters, so the cost is linear in the number of pixels
+        regardless of radius. Each channel is filtered with itself as the guide.
+        cv2.ximgproc.guidedFilter is not used even when opencv-contrib is
+        installed: with a 3-channel guide it runs the colour-guided variant,
+        which gives different results.
+
+        Args:
+            image_cv: OpenCV image as numpy array (uint8)
+            radius: Window radius in pixels
+            eps: Regularization on the 0-255 intensity scale; local variance well
+                 below eps is smoothed, edges with variance above it are kept
+
+        Returns:
+            Filtered image (uint8)
+        """
+        img = image_cv.astype(np.float32)
+        ksize = (2 * radius + 1, 2 * radius + 1)
+
+        mean = cv2.boxFilter(img, -1, ksize)
+        var = cv2.boxFilter(img * img, -1, ksize) - mean * mean
+
+        # Per-window linear model q = a * I + b, then average the coefficients
+        a = var / (var + np.float32(eps))
+        b = mean - a * mean
+        filtered = cv2.boxFilter(a, -1, ksize) * img + cv2.boxFilter(b, -1, ksize)
+        return np.clip(filtered + 0.5, 0, 255).astype(np.uint8)
+
     @staticmethod
     def save_preprocessed_image(image_cv: np.ndarray, output_path: str) -> None:
         """
@@ -190,6 +422,59 @@ class ImagePreprocessor:
         if not success:
             raise IOError(f"Failed to save image to {output_path}")
     
+    @staticmethod
+    def pipeline_signature() -> str:
+        """
+        Describe everything that determines preprocess_image's output for a file
+        
+        Covers PIPELINE_VERSION, the enhancement and encoding settings and the
+        JPEG encoder in use, so caches of preprocessed payloads can key on it.
+        
+        Returns:
+            Signature string
+        """
+        encoder = 'turbojpeg' if _TURBO_JPEG is not None else 'cv2'
+        return repr((
+            ImagePreprocessor.PIPELINE_VERSION,
+            ImagePreprocessor.SKIP_ENHANCE_MIN_BYTES_PER_PIXEL,
+            ImagePreprocessor.SKIP_ENHANCE_MAX_PIXELS,
+            ImagePreprocessor.MAX_ENHANCE_DIMENSION,
+            ImagePreprocessor.JPEG_QUALITY,
+            ImagePreprocessor.CLAHE_CLIP_LIMIT,
+            ImagePreprocessor.CLAHE_TILE_GRID,
+            ImagePreprocessor.GUIDED_FILTER_RADIUS,
+            ImagePreprocessor.GUIDED_FILTER_EPS,
+            encoder,
+            cv2.__version__,
+        ))
+    
+    @staticmethod
+    def encode_jpeg(image_cv: np.ndarray) -> Union[bytes, np.ndarray]:
+        """
+        Encode a BGR image as JPEG at JPEG_QUALITY with 4:2:0 chroma subsampling
+        
+        Uses libjpeg-turbo directly through PyTurboJPEG when it is installed,
+        otherwise cv2.imencode.
+        
+        Args:
+            image_cv: OpenCV image as numpy array (BGR format)
+            
+        Returns:
+            Encoded JPEG as a bytes-like object
+            
+        Raises:
+            IOError: If encoding fails
+        """
+        if _TURBO_JPEG is not None:
+            return _TURBO_JPEG.encode(np.ascontiguousarray(image_cv), quality=ImagePreprocessor.JPEG_QUALITY,
+                                      pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+        
+        success, buf = cv2.imencode('.jpg', image_cv, [cv2.IMWRITE_JPEG_QUALITY, ImagePreprocessor.JPEG_QUALITY,
+                                                       cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+        if not success:
+            raise IOError("Failed to encode image as JPEG")
+        return buf
+    
     @staticmethod
     def get_image_dimensions(image_path: str) -> Tuple[int, int]:
         """
@@ -201,44 +486,64 @@ class ImagePreprocessor:
         Returns:
             Tuple of (width, height)
         """
-        img = ImagePreprocessor.load_image_with_pillow(image_path)
-        return img.size
+        # JPEG and PNG sizes come straight from the header; Pillow handles the rest
+        dimensions = ImagePreprocessor.read_jpeg_dimensions(image_path)
+        if dimensions is None:
+            dimensions = ImagePreprocessor.read_png_dimensions(image_path)
+        if dimensions is not None:
+            return dimensions
+        
+        with ImagePreprocessor.load_image_with_pillow(image_path) as img:
+            return img.size
 
 
-def preprocess_image(image_path: str, enhance: bool = True) -> bytes:
+def preprocess_image(image_path: str, enhance: bool = True, out: Optional[bytearray] = None,
+                     validate: bool = True) -> Union[bytes, bytearray, mmap.mmap]:
     """
     Preprocess an image and return as bytes for Textract
     
     Args:
         image_path: Path to the image file
         enhance: Whether to enhance the image for better OCR results
+        out: Optional reusable buffer for the encoded JPEG. It is resized to the
+             encoded length and returned; reusing one buffer per thread lets
+             CPython keep its allocation between similarly sized images.
+             Ignored when enhance is False.
+        validate: Validate the file first; pass False when the caller has
+                  already run ImagePreprocessor.validate_image_file
         
     Returns:
-        Preprocessed image as bytes
+        Preprocessed image as bytes (or `out`, when given). Images sent
+        unmodified are returned as a read-only mmap of the file instead of a
+        copy; callers should close it after the Textract call.
         
     Raises:
         ValueError: If image validation fails
         IOError: If image processing fails
     """
     # Validate image
-    is_valid, error_msg = ImagePreprocessor.validate_image_file(image_path)
-    if not is_valid:
-        raise ValueError(error_msg)
+    if validate:
+        is_valid, error_msg = ImagePreprocessor.validate_image_file(image_path)
+        if not is_valid:
+            raise ValueError(error_msg)
     
-    # Load and enhance if requested
-    if enhance:
+    # Load and enhance if requested (and if the image would benefit)
+    if enhance and ImagePreprocessor.needs_enhancement(image_path):
         img_cv = ImagePreprocessor.load_image_with_opencv(image_path)
         
+        # Downscale first so the filters only touch pixels Textract needs
+        img_cv = ImagePreprocessor.downscale_to_max_dimension(img_cv, ImagePreprocessor.MAX_ENHANCE_DIMENSION)
+        
         # Apply enhancements
         img_cv = ImagePreprocessor.apply_bilateral_filter(img_cv)
         img_cv = ImagePreprocessor.enhance_contrast(img_cv)
         
-        # Convert enhanced image back to bytes using Pillow
-        img_pil = Image.fromarray(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
-        import io
-        img_bytes = io.BytesIO()
-        img_pil.save(img_bytes, format='JPEG', quality=95)
-        return img_bytes.getvalue()
+        # Encode the BGR image straight to JPEG (no RGB conversion or PIL round-trip)
+        encoded = ImagePreprocessor.encode_jpeg(img_cv)
+        if out is None:
+            return bytes(encoded)
+        out[:] = memoryview(encoded)
+        return out
     else:
-        # Load raw image bytes
-        return ImagePreprocessor.load_image_as_bytes(image_path)
+        # Send the file as-is, mapped rather than copied
+        return ImagePreprocessor.map_image_file(image_path)
@@ -5,18 +5,22 @@ AWS Textract Number Plate Extractor - CLI Entry Point
 Extract number plates from vehicle images using AWS Textract API.
 """
 
+from __future__ import annotations
+
 import argparse
+import mmap
 import sys
 import os
+import threading
 from typing import List, Dict, Any
 import json
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from image_preprocessor import preprocess_image, ImagePreprocessor
-from textract_client import get_textract_client, TextractClient
-from plate_parser import parse_plates_from_textract
+# image_preprocessor (OpenCV/NumPy), plate_parser and textract_client (boto3)
+# are imported where they are used, so `--help` and argument errors don't pay
+# for loading them
 from utils import (
     print_results_table,
     print_results_json,
@@ -33,6 +37,12 @@ from utils import (
 class NumberPlateExtractor:
     """Main application class for number plate extraction"""
     
+    # Upper bound on concurrent images in folder mode
+    MAX_WORKERS = 16
+    
+    # Upper bound on in-flight Textract requests in process_folder_async
+    MAX_ASYNC_REQUESTS = 20
+    
     def __init__(self, confidence: float = 60.0, pattern: str = None, region: str = None):
         """
         Initialize the extractor
@@ -49,6 +59,14 @@ class NumberPlateExtractor:
         self.pattern = pattern
         self.region = region
         
+        # Serializes console output when images are processed concurrently
+        self._print_lock = threading.Lock()
+        
+        # Per-thread scratch state (reusable JPEG encode buffer)
+        self._thread_state = threading.local()
+        
+        from textract_client import get_textract_client
+        
         # Initialize Textract client
         try:
             self.textract = get_textract_client(region=self.region)
@@ -56,80 +74,178 @@ class NumberPlateExtractor:
             print(f"Failed to initialize Textract client: {str(e)}", file=sys.stderr)
             sys.exit(1)
     
-    def process_image(self, image_path: str, enhance: bool = True) -> Dict[str, Any]:
+    @property
+    def output_lock(self) -> threading.Lock:
         """
-        Process a single image and extract number plates
+        Lock held while an image's progress lines are written
+        
+        Hold it to print from another thread without interleaving with the
+        output of images that are still being processed.
+        """
+        return self._print_lock
+    
+    def _write_log(self, lines: List[str], error: str = None) -> None:
+        """
+        Write an image's buffered progress lines in one go
+        
+        Keeps output from concurrently processed images from interleaving and
+        costs one write per stream instead of one print per line.
+        
+        Args:
+            lines: Progress lines for stdout
+            error: Optional error line for stderr
+        """
+        with self._print_lock:
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+            if error:
+                sys.stderr.write(error + "\n")
+    
+    def _encode_buffer(self) -> bytearray:
+        """
+        Get the calling thread's reusable JPEG encode buffer
+        
+        Returns:
+            Thread-local bytearray passed to preprocess_image
+        """
+        buffer = getattr(self._thread_state, 'encode_buffer', None)
+        if buffer is None:
+            buffer = bytearray()
+            self._thread_state.encode_buffer = buffer
+        return buffer
+    
+    @staticmethod
+    def _new_result(image_path: str) -> Dict[str, Any]:
+        """
+        Create an empty result dictionary for an image
         
         Args:
             image_path: Path to the image file
-            enhance: Whether to enhance the image
             
         Returns:
-            Dictionary with extraction results
+            Result dictionary marked as unsuccessful
         """
-        result = {
+        return {
             'image': image_path,
             'success': False,
             'plates': [],
             'all_detected_text': [],
             'error': None
         }
+    
+    def _prepare_image(self, image_path: str, enhance: bool, log_lines: List[str],
+                       reuse_buffer: bool = True) -> Any:
+        """
+        Validate and preprocess an image into a Textract payload
         
-        try:
-            # Validate image
-            is_valid, error_msg = ImagePreprocessor.validate_image_file(image_path)
-            if not is_valid:
-                raise ValueError(error_msg)
-            
-            print(f"Processing: {image_path}")
-            
-            # Preprocess image
-            image_bytes = preprocess_image(image_path, enhance=enhance)
-            
-            # Detect text with Textract
-            print(f"  - Calling Textract API...")
-            response = self.textract.detect_document_text(image_bytes)
+        Args:
+            image_path: Path to the image file
+            enhance: Whether to enhance the image
+            log_lines: Progress lines for this image (appended to)
+            reuse_buffer: Encode into the calling thread's reusable buffer; only
+                          safe when the payload is sent before this thread
+                          prepares another image
             
-            # Format response
-            formatted_response = TextractClient.format_response(response)
+        Returns:
+            Bytes-like payload (an mmap for unenhanced images; close it after use)
             
-            # Parse plates and get all detected text
-            parse_result = parse_plates_from_textract(
-                formatted_response,
-                confidence_threshold=self.confidence,
-                pattern=self.pattern
-            )
+        Raises:
+            ValueError: If image validation fails
+        """
+        from image_preprocessor import preprocess_image, ImagePreprocessor
+        
+        # Validate image
+        is_valid, error_msg = ImagePreprocessor.validate_image_file(image_path)
+        if not is_valid:
+            raise ValueError(error_msg)
+        
+        log_lines.append(f"Processing: {image_path}")
+        
+        # Preprocess image (already validated above)
+        out = self._encode_buffer() if reuse_buffer else None
+        return preprocess_image(image_path, enhance=enhance, out=out, validate=False)
+    
+    def _apply_response(self, result: Dict[str, Any], response: Dict[str, Any], log_lines: List[str]) -> None:
+        """
+        Parse a Textract response into an image's result dictionary
+        
+        Args:
+            result: Result dictionary to fill in
+            response: Raw Textract API response
+            log_lines: Progress lines for this image (appended to)
+        """
+        from plate_parser import parse_plates_from_textract
+        from textract_client import TextractClient
+        
+        # Format response
+        formatted_response = TextractClient.format_response(response)
+        
+        # Parse plates and get all detected text
+        parse_result = parse_plates_from_textract(
+            formatted_response,
+            confidence_threshold=self.confidence,
+            pattern=self.pattern
+        )
+        
+        result['plates'] = parse_result['plates']
+        result['all_detected_text'] = parse_result['all_detected_text']
+        result['success'] = True
+        
+        if parse_result['plates']:
+            log_lines.append(f"  - Found {len(parse_result['plates'])} plate(s)")
+        else:
+            log_lines.append("  - No plates detected")
+        
+        log_lines.append(f"  - Total text detected: {len(parse_result['all_detected_text'])} blocks")
+    
+    def process_image(self, image_path: str, enhance: bool = True) -> Dict[str, Any]:
+        """
+        Process a single image and extract number plates
+        
+        Args:
+            image_path: Path to the image file
+            enhance: Whether to enhance the image
             
-            result['plates'] = parse_result['plates']
-            result['all_detected_text'] = parse_result['all_detected_text']
-            result['success'] = True
+        Returns:
+            Dictionary with extraction results
+        """
+        result = self._new_result(image_path)
+        log_lines = []
+        error_line = None
+        
+        try:
+            image_bytes = self._prepare_image(image_path, enhance, log_lines)
             
-            if parse_result['plates']:
-                print(f"  - Found {len(parse_result['plates'])} plate(s)")
-            else:
-                print(f"  - No plates detected")
+            # Detect text with Textract
+            log_lines.append("  - Calling Textract API...")
+            try:
+                response = self.textract.detect_document_text(image_bytes)
+            finally:
+                # Unenhanced images come back as a file mapping
+                if isinstance(image_bytes, mmap.mmap):
+                    image_bytes.close()
             
-            print(f"  - Total text detected: {len(parse_result['all_detected_text'])} blocks")
+            self._apply_response(result, response, log_lines)
             
         except ValueError as e:
             result['error'] = str(e)
-            print(f"  - Validation Error: {str(e)}", file=sys.stderr)
+            error_line = f"  - Validation Error: {str(e)}"
         except Exception as e:
             result['error'] = str(e)
-            print(f"  - Error: {str(e)}", file=sys.stderr)
+            error_line = f"  - Error: {str(e)}"
         
+        self._write_log(log_lines, error_line)
         return result
     
-    def process_folder(self, folder_path: str, enhance: bool = True) -> List[Dict[str, Any]]:
+    def _list_folder_images(self, folder_path: str) -> List[str]:
         """
-        Process all images in a folder
+        List the images in a folder, exiting with an error if there are none
         
         Args:
             folder_path: Path to the folder
-            enhance: Whether to enhance images
             
         Returns:
-            List of results for each image
+            Sorted list of image file paths
         """
         try:
             image_files = get_image_files(folder_path)
@@ -142,14 +258,148 @@ class NumberPlateExtractor:
             sys.exit(1)
         
         print(f"Found {len(image_files)} image(s) to process\n")
+        return image_files
+    
+    def process_folder(self, folder_path: str, enhance: bool = True) -> List[Dict[str, Any]]:
+        """
+        Process all images in a folder
+        
+        Args:
+            folder_path: Path to the folder
+            enhance: Whether to enhance images
+            
+        Returns:
+            List of results for each image
+        """
+        from concurrent.futures import ThreadPoolExecutor
         
-        results = []
-        for image_path in image_files:
-            result = self.process_image(image_path, enhance=enhance)
-            results.append(result)
+        image_files = self._list_folder_images(folder_path)
+        
+        # Textract calls are network-bound and OpenCV releases the GIL, so a
+        # thread pool overlaps preprocessing with in-flight requests.
+        # map() keeps results in the same order as image_files.
+        max_workers = min(self.MAX_WORKERS, len(image_files))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda image_path: self.process_image(image_path, enhance=enhance),
+                image_files
+            ))
         
         return results
     
+    async def _process_image_async(self, image_path: str, enhance: bool, detect,
+                                   semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Async counterpart of process_image
+        
+        Preprocessing runs in the default executor so the event loop stays free
+        while other requests are in flight.
+        
+        Args:
+            image_path: Path to the image file
+            enhance: Whether to enhance the image
+            detect: Coroutine function sending a payload to Textract
+            semaphore: Limits the number of images in flight
+            
+        Returns:
+            Dictionary with extraction results
+        """
+        import asyncio
+        
+        result = self._new_result(image_path)
+        log_lines = []
+        error_line = None
+        loop = asyncio.get_running_loop()
+        
+        async with semaphore:
+            try:
+                # The payload outlives the executor call, so it must not share
+                # the worker thread's reusable buffer
+                image_bytes = await loop.run_in_executor(
+                    None, self._prepare_image, image_path, enhance, log_lines, False
+                )
+                
+                log_lines.append("  - Calling Textract API...")
+                try:
+                    response = await detect(image_bytes)
+                finally:
+                    if isinstance(image_bytes, mmap.mmap):
+                        image_bytes.close()
+                
+                self._apply_response(result, response, log_lines)
+                
+            except ValueError as e:
+                result['error'] = str(e)
+                error_line = f"  - Validation Error: {str(e)}"
+            except Exception as e:
+                result['error'] = str(e)
+                error_line = f"  - Error: {str(e)}"
+        
+        self._write_log(log_lines, error_line)
+        return result
+    
+    async def process_folder_async(self, folder_path: str, enhance: bool = True) -> List[Dict[str, Any]]:
+        """
+        Process all images in a folder from a single asyncio event loop
+        
+        Uses aiobotocore's async Textract client when it is installed, so many
+        requests can be in flight without a thread each; otherwise the
+        synchronous client runs in the default executor. At most
+        MAX_ASYNC_REQUESTS images are processed at once.
+        
+        Args:
+            folder_path: Path to the folder
+            enhance: Whether to enhance images
+            
+        Returns:
+            List of results for each image, in folder order
+        """
+        import asyncio
+        
+        image_files = self._list_folder_images(folder_path)
+        semaphore = asyncio.Semaphore(self.MAX_ASYNC_REQUESTS)
+        
+        try:
+            from aiobotocore.session import get_session
+        except ImportError:
+            loop = asyncio.get_running_loop()
+            
+            async def detect(image_bytes):
+                return await loop.run_in_executor(None, self.textract.detect_document_text, image_bytes)
+            
+            return list(await asyncio.gather(
+                *(self._process_image_async(p, enhance, detect, semaphore) for p in image_files)
+            ))
+        
+        from aiobotocore.config import AioConfig
+        
+        # Same region, credentials, retry policy and error mapping as the sync client
+        textract = self.textract
+        async with get_session().create_client(
+            'textract',
+            config=AioConfig(**textract.config_kwargs(self.MAX_ASYNC_REQUESTS)),
+            **textract.client_kwargs()
+        ) as client:
+            cache = textract.cache
+            error_map = textract.build_error_map(client)
+            
+            async def detect(image_bytes):
+                # Same response cache as TextractClient.detect_document_text
+                key = cache.make_key(image_bytes, textract.region) if cache else None
+                response = cache.get(key) if key else None
+                if response is None:
+                    try:
+                        response = await client.detect_document_text(Document={'Bytes': image_bytes})
+                    except Exception as e:
+                        raise textract.map_api_error(e, error_map)
+                    if key:
+                        cache.put(key, response)
+                return response
+            
+            return list(await asyncio.gather(
+                *(self._process_image_async(p, enhance, detect, semaphore) for p in image_files)
+            ))
+    
     def process_single_image(self, image_path: str, enhance: bool = True) -> Dict[str, Any]:
         """
         Process a single image
@@ -283,7 +533,7 @@ Examples:
                 output = print_results_json(args.image, result['plates'], result.get('all_detected_text', []))
                 print(output)
                 if args.output:
-                    with open(args.output, 'w') as f:
+                    with open(args.output, 'w', encoding='utf-8') as f:
                         f.write(output)
                     print(f"\nResults saved to {args.output}")
             else:
@@ -322,7 +572,7 @@ Examples:
                 print("\nDetailed Results (JSON):")
                 print(output)
                 if args.output:
-                    with open(args.output, 'w') as f:
+                    with open(args.output, 'w', encoding='utf-8') as f:
                         f.write(output)
                     print(f"\nResults saved to {args.output}")
             elif args.csv:
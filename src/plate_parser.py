@@ -5,20 +5,21 @@ from typing import List, Dict, Tuple, Optional
 
 
 # Known Indian state/UT codes (2-letter)
-INDIAN_STATE_CODES = {
+INDIAN_STATE_CODES = frozenset({
     'AN', 'AP', 'AR', 'AS', 'BR', 'CG', 'CH', 'DD', 'DL', 'GA', 'GJ', 'HP',
     'HR', 'JH', 'JK', 'KA', 'KL', 'LA', 'LD', 'MH', 'ML', 'MN', 'MP', 'MZ',
     'NL', 'OD', 'PB', 'PY', 'RJ', 'SK', 'TG', 'TN', 'TR', 'TS', 'UK', 'UP',
     'WB',
-}
+})
 
 # Common OCR confusables: what gets misread as what
 # Used only in digit positions
 OCR_DIGIT_FIXES = {'O': '0', 'I': '1', 'l': '1', 'S': '5', 'B': '8', 'G': '6', 'D': '0'}
 OCR_LETTER_FIXES = {'0': 'O', '1': 'I', '5': 'S', '8': 'B', '6': 'G'}
+_LETTER_FIX_TABLE = str.maketrans(OCR_LETTER_FIXES)
 
 # Junk / noise words to ignore completely
-NOISE_WORDS = {
+NOISE_WORDS = frozenset({
     'IND', 'NO', 'ND', 'MC', 'HIRE', 'FOR', 'GOODS', 'CARRIER', 'CONTRACT',
     'CARRIAGE', 'GOVT', 'HICLE', 'VEHICLE', 'AUTO', 'MOTOR', 'CAB', 'CNG',
     'ASHOK', 'LEYLAND', 'ASHOKILEYLAND', 'TATA', 'SIGNA', 'EICHER', 'KIA',
@@ -31,10 +32,28 @@ NOISE_WORDS = {
     'PP', 'CK', 'KO', 'AO', 'LI', 'RE', 'DE', 'BE', 'YK', 'YS',
     'ARM', 'CII', 'NZB', 'ISI', 'PO', 'JAI', 'SANTOS', 'HILL',
     'PRO', 'EUTECH', 'EUTECH6', 'MEONAME',
-}
+})
 
 # Prefixes to strip before parsing
-STRIP_PREFIXES = ['(ND)', 'IND', 'NO', 'ND']
+STRIP_PREFIXES = ('(ND)', 'IND', 'NO', 'ND')
+
+# Precompiled patterns for the per-block cleaning / noise checks
+# STRIP_PREFIXES in order, each stripped when followed by a space/tab or a letter
+_RE_STRIP_PREFIXES = re.compile(
+    '^' + ''.join(rf'(?:{re.escape(p)}(?=[ \t]|[^\W\d_])\s*)?' for p in STRIP_PREFIXES),
+    re.IGNORECASE,
+)
+_RE_PLATE_OVERLAY = re.compile(r'Plate:\s*([A-Z0-9\s]{6,15})', re.IGNORECASE)
+_RE_PLATE_OVERLAY_COMPACT = re.compile(r'Plate:\s*([A-Z0-9]{6,15})', re.IGNORECASE)
+_STRIP_CHARS_TABLE = str.maketrans('', '', '.')
+_EDGE_JUNK_CHARS = '"\'()[]{}.,;:!?*# '
+_RE_EMBED_HYPHEN = re.compile(r'(?<=[A-Za-z0-9])-(?=[A-Za-z0-9])')
+_RE_WS = re.compile(r'\s+')
+_RE_TIMESTAMP = re.compile(r'^\d{1,2}:\d{2}(:\d{2})?$')
+_RE_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+_RE_KMH = re.compile(r'^\d+\s*km/h$', re.IGNORECASE)
+_RE_RHS = re.compile(r'^[\d+]*\s*RHS$', re.IGNORECASE)
+_RE_LHS = re.compile(r'^[\d+]*\s*LHS$', re.IGNORECASE)
 
 
 class PlateParser:
@@ -84,12 +103,39 @@ class PlateParser:
         """
         self.confidence_threshold = confidence_threshold
 
+        # A pattern with no lower-case letters, escapes or (?...) groups matches upper-cased
+        # text exactly as it would match the original with IGNORECASE, and runs without
+        # per-character case folding
+        self._custom_matches_upper = bool(pattern) and pattern == pattern.upper() \
+            and '\\' not in pattern and '(?' not in pattern
         if pattern:
-            self.custom_pattern = re.compile(pattern, re.IGNORECASE)
+            flags = 0 if self._custom_matches_upper else re.IGNORECASE
+            self.custom_pattern = re.compile(pattern, flags)
         else:
             self.custom_pattern = None
 
-        self.compiled_patterns = [re.compile(p) for p in self.INDIAN_PATTERNS]
+        self.compiled_patterns = self._get_compiled_patterns()
+        self._combined_re = self._get_combined_pattern()
+
+    @classmethod
+    def _get_compiled_patterns(cls) -> List[re.Pattern]:
+        """INDIAN_PATTERNS compiled once per class and shared by every instance"""
+        if '_COMPILED_PATTERNS' not in cls.__dict__:
+            cls._COMPILED_PATTERNS = [re.compile(p) for p in cls.INDIAN_PATTERNS]
+        return cls._COMPILED_PATTERNS
+
+    @classmethod
+    def _get_combined_pattern(cls) -> re.Pattern:
+        """
+        All INDIAN_PATTERNS as one anchored alternation, compiled once per class.
+        A single match call lets the regex engine try the alternatives in C
+        instead of looping over 15 patterns in Python.
+        """
+        if '_COMBINED_PATTERN' not in cls.__dict__:
+            # Drop each pattern's own ^...$ anchors and anchor the alternation once
+            alternatives = '|'.join(f'(?:{p[1:-1]})' for p in cls.INDIAN_PATTERNS)
+            cls._COMBINED_PATTERN = re.compile(f'^(?:{alternatives})$')
+        return cls._COMBINED_PATTERN
 
     # ------------------------------------------------------------------ #
     #                        TEXT CLEANING                                 #
@@ -113,31 +159,26 @@ class PlateParser:
         t = text.strip()
 
         # ---- Extract from speed-camera overlay "Plate: XXXXX" ----
-        plate_match = re.search(r'Plate:\s*([A-Z0-9\s]{6,15})', t, re.IGNORECASE)
+        plate_match = _RE_PLATE_OVERLAY.search(t)
         if plate_match:
             t = plate_match.group(1).strip()
 
-        # ---- Strip known prefixes ----
-        for prefix in STRIP_PREFIXES:
-            if t.upper().startswith(prefix + ' ') or t.upper().startswith(prefix + '\t'):
-                t = t[len(prefix):].strip()
-            # Also handle no-space variant like "INDTS..."
-            elif t.upper().startswith(prefix) and len(t) > len(prefix) and t[len(prefix)].isalpha():
-                t = t[len(prefix):].strip()
+        # ---- Strip known prefixes (also the no-space variant like "INDTS...") ----
+        t = _RE_STRIP_PREFIXES.sub('', t, count=1)
 
         # ---- Strip leading / trailing junk characters ----
-        t = t.strip('"\'()[]{}.,;:!?*# ')
+        t = t.strip(_EDGE_JUNK_CHARS)
         # Strip leading/trailing hyphens but keep internal ones for now
         t = t.strip('-')
 
         # ---- Remove dots used as separators (TN.52 L.0083 → TN52 L0083) ----
-        t = re.sub(r'\.', '', t)
+        t = t.translate(_STRIP_CHARS_TABLE)
 
         # ---- Remove embedded hyphens between letters/digits (U-D → UD) ----
-        t = re.sub(r'(?<=[A-Za-z0-9])-(?=[A-Za-z0-9])', '', t)
+        t = _RE_EMBED_HYPHEN.sub('', t)
 
         # ---- Collapse multiple spaces ----
-        t = re.sub(r'\s+', ' ', t).strip()
+        t = _RE_WS.sub(' ', t).strip()
 
         return t
 
@@ -182,27 +223,31 @@ class PlateParser:
     @staticmethod
     def is_noise(text: str) -> bool:
         """Check if a text block is noise / not plate-related"""
-        t = text.strip().upper().rstrip('.-:,;!?')
+        # Strip before upper-casing: on already-clean text both strips are no-ops that
+        # return the same string, leaving upper() as the only copy
+        t = text.strip().rstrip('.-:,;!?').upper()
         # Single char
         if len(t) <= 1:
             return True
         # Pure noise word
         if t in NOISE_WORDS:
             return True
+        # Each regex below only runs when its required character / suffix is present
         # Looks like a timestamp  HH:MM:SS or date
-        if re.match(r'^\d{1,2}:\d{2}(:\d{2})?$', t):
+        if ':' in t and _RE_TIMESTAMP.match(t):
             return True
-        if re.match(r'^\d{4}-\d{2}-\d{2}', t):
+        if '-' in t and len(t) >= 10 and _RE_DATE.match(t):
             return True
         # Speed overlay fragments  "XX km/h", "420 RHS", etc.
-        if re.match(r'^\d+\s*km/h$', t, re.IGNORECASE):
+        if '/' in t and _RE_KMH.match(t):
             return True
-        if re.match(r'^[\d+]*\s*RHS$', t, re.IGNORECASE):
+        last3 = t[-3:]
+        if last3 == 'RHS' and _RE_RHS.match(t):
             return True
-        if re.match(r'^[\d+]*\s*LHS$', t, re.IGNORECASE):
+        if last3 == 'LHS' and _RE_LHS.match(t):
             return True
-        # Gmail / urls
-        if '@' in t or 'gmail' in t.lower():
+        # Gmail / urls (t is already upper-case)
+        if '@' in t or 'GMAIL' in t:
             return True
         return False
 
@@ -213,20 +258,30 @@ class PlateParser:
     def matches_plate_pattern(self, text: str) -> bool:
         """Check if text matches any known Indian plate pattern"""
         if self.custom_pattern:
-            return bool(self.custom_pattern.match(text))
+            return bool(self.custom_pattern.match(text.upper() if self._custom_matches_upper else text))
 
-        t = text.upper().strip()
-        for pat in self.compiled_patterns:
-            if pat.match(t):
-                return True
-        return False
+        return bool(self._combined_re.match(text.upper().strip()))
+
+    def _matches_plate_pattern_upper(self, text: str, upper: str) -> bool:
+        """
+        matches_plate_pattern for cleaned text whose upper-case form is already known.
+        """
+        if self.custom_pattern:
+            return bool(self.custom_pattern.match(upper if self._custom_matches_upper else text))
+
+        return bool(self._combined_re.match(upper))
 
     def validate_state_code(self, text: str) -> bool:
         """Check if the first 2 letters are a valid Indian state code"""
-        clean = text.replace(' ', '').replace('-', '').upper()
-        if len(clean) >= 2:
-            return clean[:2] in INDIAN_STATE_CODES
-        return False
+        return self._state_prefix(text.upper()) in INDIAN_STATE_CODES
+
+    @staticmethod
+    def _state_prefix(text: str) -> str:
+        """
+        First 2 characters of text, ignoring spaces and hyphens (cleaned text can
+        still have internal spaces, or a leading '-')
+        """
+        return text.replace(' ', '').replace('-', '')[:2]
 
     @staticmethod
     def filter_by_confidence(blocks: List[Dict], threshold: float) -> List[Dict]:
@@ -238,60 +293,84 @@ class PlateParser:
         """
         Merge adjacent words to form potential license plate strings
         """
-        if not words:
-            return []
-
-        merged = []
-        current_text = words[0].get('text', '')
-        current_group = [words[0]]
+        return PlateParser._merge_adjacent_texts(
+            [word.get('text', '') for word in words],
+            [word.get('geometry', {}) for word in words],
+        )
 
-        for i in range(1, len(words)):
-            word = words[i]
-            prev_word = current_group[-1]
+    @staticmethod
+    def _merge_adjacent_texts(texts: List[str], geometries: List[Dict]) -> List[str]:
+        """
+        merge_adjacent_words over parallel lists of word texts and geometries
+        """
+        if not texts:
+            return []
 
-            prev_geometry = prev_word.get('geometry', {})
-            curr_geometry = word.get('geometry', {})
+        # Left / right edges of every word, read from the geometry once
+        boxes = [geometry.get('BoundingBox', {}) for geometry in geometries]
+        lefts = [box.get('Left', 0) for box in boxes]
+        rights = [left + box.get('Width', 0) for left, box in zip(lefts, boxes)]
 
-            prev_right = prev_geometry.get('BoundingBox', {}).get('Left', 0) + \
-                         prev_geometry.get('BoundingBox', {}).get('Width', 0)
-            curr_left = curr_geometry.get('BoundingBox', {}).get('Left', 0)
+        merged = []
+        current_text = texts[0]
 
-            if curr_left - prev_right < 0.05:  # Widened threshold for close words
-                current_text += ' ' + word.get('text', '')
-                current_group.append(word)
+        for i in range(1, len(texts)):
+            if lefts[i] - rights[i - 1] < 0.05:  # Widened threshold for close words
+                current_text += ' ' + texts[i]
             else:
                 if current_text.strip():
                     merged.append(current_text.strip())
-                current_text = word.get('text', '')
-                current_group = [word]
+                current_text = texts[i]
 
         if current_text.strip():
             merged.append(current_text.strip())
 
         return merged
 
-    def _try_match(self, text: str, confidence: float) -> Optional[Dict]:
+    def _try_match(self, text: str, confidence: float) -> Optional[Tuple[Dict, str]]:
         """
         Try to match a text string as a plate. Applies cleaning, OCR fixes, etc.
-        Returns a plate dict or None.
+        Returns (plate dict, dedupe key) or None; the key is the plate text
+        upper-cased with spaces removed.
         """
         # Step 1: clean
-        cleaned = self.clean_raw_text(text)
+        return self._try_match_cleaned(self.clean_raw_text(text), confidence)
+
+    def _try_match_cleaned(self, cleaned: str, confidence: float,
+                           noisy: Optional[bool] = None) -> Optional[Tuple[Dict, str]]:
+        """
+        Same as _try_match, for text that has already been through clean_raw_text.
+        `noisy` is the precomputed is_noise(cleaned), when the caller has it.
+        """
         if not cleaned or len(cleaned) < 5:
             return None
 
+        # Upper-case once; the prefix checks and both pattern matches reuse it
+        upper = cleaned.upper()
+        prefix = self._state_prefix(upper)
+
+        # Every match needs a state code up front (possibly after the OCR letter fix),
+        # so reject anything else before any regex runs
+        valid_prefix = prefix in INDIAN_STATE_CODES
+        if not valid_prefix and prefix.translate(_LETTER_FIX_TABLE) not in INDIAN_STATE_CODES:
+            return None
+
         # Step 2: skip noise
-        if self.is_noise(cleaned):
+        if noisy is None:
+            noisy = self.is_noise(cleaned)
+        if noisy:
             return None
 
         # Step 3: try direct match
-        if self.matches_plate_pattern(cleaned) and self.validate_state_code(cleaned):
-            return {'text': cleaned, 'confidence': confidence}
+        if valid_prefix and self._matches_plate_pattern_upper(cleaned, upper):
+            return {'text': cleaned, 'confidence': confidence}, upper.replace(' ', '')
 
         # Step 4: try OCR fix
         fixed = self.fix_ocr_confusables(cleaned)
-        if fixed != cleaned and self.matches_plate_pattern(fixed) and self.validate_state_code(fixed):
-            return {'text': fixed, 'confidence': confidence}
+        if fixed != cleaned:
+            fixed_upper = fixed.upper()
+            if self._state_prefix(fixed_upper) in INDIAN_STATE_CODES and self._matches_plate_pattern_upper(fixed, fixed_upper):
+                return {'text': fixed, 'confidence': confidence}, fixed_upper.replace(' ', '')
 
         return None
 
@@ -309,53 +388,70 @@ class PlateParser:
         plates = []
         plate_texts_found = set()
 
-        def _add(plate_dict, block_type='single'):
-            norm = plate_dict['text'].replace(' ', '').upper()
-            if norm not in plate_texts_found:
-                plate_texts_found.add(norm)
+        def _add(match, block_type='single'):
+            plate_dict, key = match
+            if key not in plate_texts_found:
+                plate_texts_found.add(key)
                 plates.append({
                     'text': plate_dict['text'],
                     'confidence': plate_dict['confidence'],
                     'block_type': block_type
                 })
 
-        # ---------- Pass 1: individual blocks (all confidences) ----------
+        # One walk over the blocks, transposing them into parallel lists (strip,
+        # confidence-filter, clean and noise-check each block once); every pass
+        # below reads these lists instead of the block dicts
+        threshold = self.confidence_threshold
+        texts, confs, cleaned_texts, noise_flags = [], [], [], []
+        above_texts, above_confs, above_geoms = [], [], []
         for block in textract_blocks:
-            text = block.get('text', '').strip()
+            raw_text = block.get('text', '')
+            text = raw_text.strip()
             conf = block.get('confidence', 0)
-            if not text or conf < self.confidence_threshold:
+            cleaned = ''
+            if conf >= threshold:
+                above_texts.append(raw_text)
+                above_confs.append(conf)
+                above_geoms.append(block.get('geometry', {}))
+                if text:
+                    cleaned = self.clean_raw_text(text)
+            texts.append(text)
+            confs.append(conf)
+            cleaned_texts.append(cleaned)
+            noise_flags.append(self.is_noise(cleaned) if cleaned else True)
+
+        # ---------- Pass 1: individual blocks (all confidences) ----------
+        for i in range(len(textract_blocks)):
+            if not cleaned_texts[i]:
                 continue
 
-            result = self._try_match(text, conf)
+            result = self._try_match_cleaned(cleaned_texts[i], confs[i], noise_flags[i])
             if result:
                 _add(result, 'single')
 
         # ---------- Pass 2: combine 2-3 consecutive non-noise blocks ------
-        # Filter to blocks above threshold that aren't pure noise
-        usable = []
-        for block in textract_blocks:
-            text = block.get('text', '').strip()
-            conf = block.get('confidence', 0)
-            if not text or conf < self.confidence_threshold:
-                continue
-            cleaned = self.clean_raw_text(text)
-            if cleaned and not self.is_noise(cleaned):
-                usable.append({'text': cleaned, 'confidence': conf, 'geometry': block.get('geometry', {})})
-
-        for i in range(len(usable)):
-            for j in range(i + 1, min(i + 4, len(usable))):
-                parts = [usable[k]['text'] for k in range(i, j + 1)]
-                combined = ' '.join(parts)
-                avg_conf = sum(usable[k]['confidence'] for k in range(i, j + 1)) / (j - i + 1)
+        # Blocks above threshold that aren't pure noise
+        usable_idx = [i for i in range(len(textract_blocks)) if cleaned_texts[i] and not noise_flags[i]]
+        usable_texts = [cleaned_texts[i] for i in usable_idx]
+        usable_confs = [confs[i] for i in usable_idx]
+        n_usable = len(usable_texts)
+
+        for i in range(n_usable):
+            combined = usable_texts[i]
+            conf_sum = usable_confs[i]
+            for j in range(i + 1, min(i + 4, n_usable)):
+                combined += ' ' + usable_texts[j]
+                conf_sum += usable_confs[j]
+                avg_conf = conf_sum / (j - i + 1)
+                # Re-clean the joined text: cleaning is not idempotent (a second
+                # pass strips the "NO" left over from "ND NO KA53A")
                 result = self._try_match(combined, avg_conf)
                 if result:
                     _add(result, 'merged')
 
         # ---------- Pass 3: extract "Plate: XXX" from overlay text --------
-        for block in textract_blocks:
-            text = block.get('text', '').strip()
-            conf = block.get('confidence', 0)
-            plate_match = re.search(r'Plate:\s*([A-Z0-9]{6,15})', text, re.IGNORECASE)
+        for text, conf in zip(texts, confs):
+            plate_match = _RE_PLATE_OVERLAY_COMPACT.search(text)
             if plate_match:
                 candidate = plate_match.group(1).strip()
                 result = self._try_match(candidate, conf)
@@ -363,11 +459,10 @@ class PlateParser:
                     _add(result, 'overlay')
 
         # ---------- Pass 4: merge adjacent words by geometry ---------------
-        above_threshold = self.filter_by_confidence(textract_blocks, self.confidence_threshold)
-        merged_texts = self.merge_adjacent_words(above_threshold)
+        merged_texts = self._merge_adjacent_texts(above_texts, above_geoms)
+        # Every merged text is scored with the mean of all blocks above threshold
+        avg_conf = sum(above_confs) / len(above_confs) if above_confs else 0
         for merged_text in merged_texts:
-            avg_conf = sum(b.get('confidence', 0) for b in above_threshold) / len(above_threshold) \
-                if above_threshold else 0
             result = self._try_match(merged_text, avg_conf)
             if result:
                 _add(result, 'adjacent')
@@ -390,7 +485,7 @@ class PlateParser:
     @staticmethod
     def clean_plate_text(text: str) -> str:
         """Clean plate text by removing extra spaces and normalizing format"""
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _RE_WS.sub(' ', text).strip()
         text = text.replace('- ', '-').replace(' -', '-')
         return text
 
@@ -456,11 +551,13 @@ def parse_plates_from_textract(
             pattern=pattern
         )
         low_plates = low_parser.extract_plates(lines)
+        existing_texts = {p['text'] for p in formatted_plates}
 
         for plate in low_plates:
             if plate['confidence'] < confidence_threshold and plate['confidence'] >= low_confidence_threshold:
                 plate_text = plate['text']
-                if not any(p['text'] == plate_text for p in formatted_plates):
+                if plate_text not in existing_texts:
+                    existing_texts.add(plate_text)
                     low_confidence_plates.append({
                         'text': plate['text'],
                         'confidence': round(plate['confidence'], 2),
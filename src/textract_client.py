@@ -1,44 +1,216 @@
 """AWS Textract client module for document text detection"""
 
 import boto3
+import hashlib
+import json
 import os
-from typing import Dict, List, Any
+import tempfile
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+from botocore.config import Config
 from dotenv import load_dotenv
-import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
 
+class ResponseCache:
+    """Content-addressed on-disk cache of Textract responses"""
+    
+    def __init__(self, cache_dir: str):
+        """
+        Initialize response cache
+        
+        Args:
+            cache_dir: Directory holding the cached responses (created on first write)
+        """
+        self.cache_dir = cache_dir
+    
+    @staticmethod
+    def make_key(image_bytes: bytes, region: str) -> str:
+        """
+        Cache key for an image payload sent to a region
+        
+        Args:
+            image_bytes: Image payload (any buffer: bytes, bytearray, mmap)
+            region: AWS region the payload is sent to
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        # Length-prefix each field so different (region, payload) pairs can't collide
+        region_bytes = region.encode('utf-8')
+        digest.update(len(region_bytes).to_bytes(8, 'big'))
+        digest.update(region_bytes)
+        digest.update(len(image_bytes).to_bytes(8, 'big'))
+        digest.update(image_bytes)
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> str:
+        """Path of the cache file for a key (fanned out by the first 2 hex digits)"""
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached Textract response, or None on a miss (or unreadable entry)
+        """
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response; failures to write are ignored (the cache is best-effort)
+        
+        Args:
+            key: Cache key from make_key
+            response: Textract response to store
+        """
+        path = self._path(key)
+        data = orjson.dumps(response) if orjson is not None else json.dumps(response).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file in the same directory, then rename over the
+            # target, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+
 class TextractClient:
     """Wrapper for AWS Textract API"""
     
-    def __init__(self, region: str = None, max_retries: int = 3, retry_delay: float = 1.0):
+    # HTTP connections kept per client; must cover NumberPlateExtractor.MAX_WORKERS
+    MAX_POOL_CONNECTIONS = 32
+    
+    def __init__(self, region: str = None, max_retries: int = 5, *, cache_dir: str = None):
         """
         Initialize Textract client
         
         Args:
             region: AWS region (defaults to AWS_REGION env var or us-east-1)
-            max_retries: Number of retries for API calls
-            retry_delay: Delay in seconds between retries
+            max_retries: Maximum number of attempts per API call (including the first)
+            cache_dir: Directory for cached responses (defaults to TEXTRACT_CACHE_DIR
+                env var; caching is off when neither is set). Keyword-only
         """
         self.max_retries = max_retries
-        self.retry_delay = retry_delay
         
         # Get region from parameter, environment, or default
         if region is None:
             region = os.getenv('AWS_REGION', 'us-east-1')
+        self.region = region
+        
+        # Identical payloads sent to the same region are answered from disk
+        if cache_dir is None:
+            cache_dir = os.getenv('TEXTRACT_CACHE_DIR')
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
         
         # Initialize Textract client
         try:
             self.client = boto3.client(
                 'textract',
-                region_name=region,
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+                config=Config(**self.config_kwargs()),
+                **self.client_kwargs()
             )
         except Exception as e:
             raise RuntimeError(f"Failed to initialize Textract client: {str(e)}")
+        
+        # Resolve the modeled exception classes once instead of on every call
+        self._error_map = self.build_error_map(self.client)
+    
+    def client_kwargs(self) -> Dict[str, Any]:
+        """
+        Region and credential arguments for creating a Textract client
+        
+        Shared by the boto3 client and the aiobotocore client in
+        NumberPlateExtractor.process_folder_async.
+        
+        Returns:
+            Keyword arguments for boto3.client / aiobotocore create_client
+        """
+        return {
+            'region_name': self.region,
+            'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
+            'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
+        }
+    
+    def config_kwargs(self, max_pool_connections: int = None) -> Dict[str, Any]:
+        """
+        Client configuration arguments (for botocore Config or aiobotocore AioConfig)
+        
+        Args:
+            max_pool_connections: HTTP connections to keep (defaults to MAX_POOL_CONNECTIONS)
+            
+        Returns:
+            Keyword arguments for the client's Config
+        """
+        # botocore retries throttling / transient errors itself, with jittered backoff;
+        # 'adaptive' mode also rate-limits on the client side after throttles.
+        # botocore always opens its sockets with TCP_NODELAY; tcp_keepalive adds SO_KEEPALIVE
+        return {
+            'retries': {'total_max_attempts': self.max_retries, 'mode': 'adaptive'},
+            'tcp_keepalive': True,
+            'max_pool_connections': max_pool_connections or self.MAX_POOL_CONNECTIONS,
+        }
+    
+    @staticmethod
+    def build_error_map(client: Any) -> Tuple[Tuple[type, type, str], ...]:
+        """
+        Map a client's modeled Textract exceptions to the errors raised to callers
+        
+        Args:
+            client: boto3 or aiobotocore Textract client
+            
+        Returns:
+            (modeled exception class, exception type to raise, message) tuples
+        """
+        exceptions = client.exceptions
+        return (
+            (exceptions.ThrottlingException, RuntimeError, "Textract API throttled after {attempts} attempts"),
+            (exceptions.InvalidParameterException, ValueError, "Invalid parameter in Textract request"),
+            (exceptions.BadDocumentException, ValueError, "Invalid or corrupted document"),
+            (exceptions.DocumentTooLargeException, ValueError, "Document too large"),
+            (exceptions.UnsupportedDocumentException, ValueError, "Unsupported document format"),
+        )
+    
+    def map_api_error(self, error: Exception, error_map: Tuple[Tuple[type, type, str], ...] = None) -> Exception:
+        """
+        Translate an error from a DetectDocumentText call into the exception raised to callers
+        
+        Args:
+            error: Exception raised by the client call
+            error_map: Result of build_error_map for the client that raised it
+                       (defaults to this instance's boto3 client)
+            
+        Returns:
+            ValueError for rejected documents / requests, RuntimeError otherwise
+        """
+        for error_class, mapped_class, message in (error_map or self._error_map):
+            if isinstance(error, error_class):
+                return mapped_class(f"{message.format(attempts=self.max_retries)}: {str(error)}")
+        return RuntimeError(f"Textract API call failed after {self.max_retries} attempts: {str(error)}")
     
     def detect_document_text(self, image_bytes: bytes) -> Dict[str, Any]:
         """
@@ -51,35 +223,35 @@ class TextractClient:
             Textract response dictionary containing detected text and metadata
             
         Raises:
-            Exception: If API call fails after retries
+            ValueError: If Textract rejects the document or request
+            RuntimeError: If API call fails after botocore's retries
         """
-        for attempt in range(self.max_retries):
-            try:
-                response = self.client.detect_document_text(
-                    Document={'Bytes': image_bytes}
-                )
-                return response
-            except self.client.exceptions.ThrottlingException as e:
-                if attempt < self.max_retries - 1:
-                    wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                    print(f"Throttled by Textract API. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    raise RuntimeError(f"Textract API throttled after {self.max_retries} attempts: {str(e)}")
-            except self.client.exceptions.InvalidParameterException as e:
-                raise ValueError(f"Invalid parameter in Textract request: {str(e)}")
-            except self.client.exceptions.BadDocumentException as e:
-                raise ValueError(f"Invalid or corrupted document: {str(e)}")
-            except self.client.exceptions.DocumentTooLargeException as e:
-                raise ValueError(f"Document too large: {str(e)}")
-            except self.client.exceptions.UnsupportedDocumentException as e:
-                raise ValueError(f"Unsupported document format: {str(e)}")
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    print(f"Attempt {attempt + 1} failed: {str(e)}. Retrying...")
-                    time.sleep(self.retry_delay)
-                else:
-                    raise RuntimeError(f"Textract API call failed after {self.max_retries} attempts: {str(e)}")
+        if self.cache is None:
+            return self._call_detect_document_text(image_bytes)
+        
+        key = self.cache.make_key(image_bytes, self.region)
+        response = self.cache.get(key)
+        if response is None:
+            response = self._call_detect_document_text(image_bytes)
+            self.cache.put(key, response)
+        return response
+    
+    def _call_detect_document_text(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Send the DetectDocumentText request, mapping API errors (see detect_document_text)
+        
+        Args:
+            image_bytes: Image file as bytes
+            
+        Returns:
+            Textract response dictionary
+        """
+        try:
+            return self.client.detect_document_text(
+                Document={'Bytes': image_bytes}
+            )
+        except Exception as e:
+            raise self.map_api_error(e)
     
     @staticmethod
     def extract_blocks_by_type(response: Dict[str, Any], block_type: str) -> List[Dict[str, Any]]:
@@ -145,27 +317,23 @@ class TextractClient:
         Returns:
             Formatted response with structured data
         """
-        lines = TextractClient.extract_blocks_by_type(response, 'LINE')
-        words = TextractClient.extract_blocks_by_type(response, 'WORD')
+        # One pass over the blocks, routing LINE and WORD blocks to their lists
+        lines = []
+        words = []
+        targets = {'LINE': lines, 'WORD': words}
+        for block in response.get('Blocks', []):
+            target = targets.get(block.get('BlockType'))
+            if target is not None:
+                target.append({
+                    'text': block.get('Text', ''),
+                    'confidence': block.get('Confidence', 0.0),
+                    'geometry': block.get('Geometry', {})
+                })
         
         return {
-            'lines': [
-                {
-                    'text': TextractClient.get_block_text(line),
-                    'confidence': TextractClient.get_block_confidence(line),
-                    'geometry': TextractClient.get_block_geometry(line)
-                }
-                for line in lines
-            ],
-            'words': [
-                {
-                    'text': TextractClient.get_block_text(word),
-                    'confidence': TextractClient.get_block_confidence(word),
-                    'geometry': TextractClient.get_block_geometry(word)
-                }
-                for word in words
-            ],
-            'raw_response': response
+            'lines': lines,
+            'words': words,
+            'raw_response': response  # a reference to the response, not a copy
         }
 
 
@@ -173,10 +341,22 @@ def get_textract_client(region: str = None) -> TextractClient:
     """
     Factory function to get a Textract client instance
     
+    Clients are cached per region, so repeated calls share one boto3 client and
+    its HTTPS connection pool. boto3 low-level clients are thread-safe, so the
+    shared instance can be used from worker threads.
+    
     Args:
         region: AWS region
         
     Returns:
         TextractClient instance
     """
+    if region is None:
+        region = os.getenv('AWS_REGION', 'us-east-1')
+    return _get_cached_client(region)
+
+
+@lru_cache(maxsize=4)
+def _get_cached_client(region: str) -> TextractClient:
+    """Build the TextractClient for a region once"""
     return TextractClient(region=region)
@@ -2,9 +2,38 @@
 
 import json
 import csv
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Callable, Optional
 from tabulate import tabulate
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Image file extensions picked up by get_image_files
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'})
+_IMAGE_EXTS_TUPLE = tuple(_IMAGE_EXTS)
+
+
+def to_json_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize an object as 2-space indented, UTF-8 encoded JSON
+    
+    Uses orjson when installed, otherwise the stdlib json module with the same
+    output settings (non-ASCII text is written as-is in both cases).
+    
+    Args:
+        obj: Object to serialize
+        default: Called for objects that are not natively serializable
+        
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=default).encode('utf-8')
+
 
 def print_results_table(image_path: str, plates: List[Dict]) -> None:
     """
@@ -27,7 +56,54 @@ def print_results_table(image_path: str, plates: List[Dict]) -> None:
     ]
     
     headers = ["Plate Number", "Confidence"]
-    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+    if all(_is_plain_table_text(text) for text, _ in table_data):
+        print(_format_grid_table(table_data, headers))
+    else:
+        print(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+
+def _is_plain_table_text(text: str) -> bool:
+    """
+    True if tabulate would render text left-aligned and unchanged: ASCII letters
+    and digits, with single internal spaces, that do not parse as a number
+    """
+    if not (text.isascii() and text == text.strip() and '  ' not in text
+            and text.replace(' ', '').isalnum()):
+        return False
+    try:
+        float(text)  # tabulate right-aligns and reformats numbers ("0012", "1E5", "INF")
+    except ValueError:
+        return True
+    return False
+
+
+def _format_grid_table(rows: List[List[str]], headers: List[str]) -> str:
+    """
+    Render string rows exactly as tabulate(..., tablefmt="grid") does for plain left-aligned text
+    
+    Args:
+        rows: Table rows; every cell must pass _is_plain_table_text or end in '%'
+        headers: Column headers
+        
+    Returns:
+        Grid table as a string
+    """
+    # tabulate pads headers by 2, and cells by 1 space on each side
+    widths = [len(header) + 2 for header in headers]
+    for row in rows:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    
+    rule = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    header_rule = '+' + '+'.join('=' * (width + 2) for width in widths) + '+'
+    
+    def render(row):
+        return '| ' + ' | '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' |'
+    
+    lines = [rule, render(headers), header_rule]
+    for row in rows:
+        lines.append(render(row))
+        lines.append(rule)
+    return '\n'.join(lines)
 
 
 def print_results_json(image_path: str, plates: List[Dict], all_text: List[Dict] = None) -> str:
@@ -49,7 +125,7 @@ def print_results_json(image_path: str, plates: List[Dict], all_text: List[Dict]
         "all_detected_text": all_text if all_text else [],
         "total_text_blocks": len(all_text) if all_text else 0
     }
-    return json.dumps(result, indent=2)
+    return to_json_bytes(result).decode('utf-8')
 
 
 def print_batch_results_json(results: List[Dict]) -> str:
@@ -66,7 +142,7 @@ def print_batch_results_json(results: List[Dict]) -> str:
         "total_images": len(results),
         "results": results
     }
-    return json.dumps(batch_result, indent=2)
+    return to_json_bytes(batch_result).decode('utf-8')
 
 
 def normalize_confidence(confidence: float) -> float:
@@ -107,25 +183,89 @@ def get_image_files(folder_path: str) -> List[str]:
     Returns:
         List of image file paths
     """
-    import os
-    from pathlib import Path
-    
     if not os.path.isdir(folder_path):
         raise ValueError(f"Invalid folder path: {folder_path}")
     
-    supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
     image_files = []
     
-    for filename in os.listdir(folder_path):
-        file_ext = Path(filename).suffix.lower()
-        if file_ext in supported_formats:
-            full_path = os.path.join(folder_path, filename)
-            if os.path.isfile(full_path):
-                image_files.append(full_path)
+    # scandir entries carry the file type from the directory listing, so
+    # is_file() needs no extra stat for regular files
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            name = entry.name
+            # A dot past the first character matches Path.suffix (".jpg" alone has no suffix)
+            if name.rfind('.') > 0 and name.lower().endswith(_IMAGE_EXTS_TUPLE) and entry.is_file():
+                image_files.append(entry.path)
     
     return sorted(image_files)
 
 
+def cached_preprocess(image_path: str, enhance: bool = True,
+                      cache_dir: str = os.path.join('.cache', 'preproc')):
+    """
+    preprocess_image with an on-disk cache of the enhanced JPEG bytes
+    
+    Entries are keyed by the image's absolute path, mtime, size, the enhance
+    flag and ImagePreprocessor.pipeline_signature(), so editing or replacing
+    the file, or changing the preprocessing settings, invalidates its entry. Images that
+    are sent as-is (a read-only mmap of the file) are not cached: the file
+    itself already is the payload.
+    
+    Args:
+        image_path: Path to the image file
+        enhance: Whether to apply image enhancement
+        cache_dir: Directory for cached payloads
+        
+    Returns:
+        Image payload, as returned by preprocess_image
+    """
+    import hashlib
+    import mmap
+    import tempfile
+    from image_preprocessor import ImagePreprocessor, preprocess_image
+    
+    st = os.stat(image_path)
+    # Length-prefix the variable-length fields and use fixed-width ones otherwise,
+    # as ResponseCache.make_key does, so no two inputs can share a key
+    path_bytes = os.fsencode(os.path.abspath(image_path))
+    signature = ImagePreprocessor.pipeline_signature().encode('utf-8')
+    digest = hashlib.sha256()
+    digest.update(len(path_bytes).to_bytes(8, 'big'))
+    digest.update(path_bytes)
+    digest.update(st.st_mtime_ns.to_bytes(16, 'big', signed=True))
+    digest.update(st.st_size.to_bytes(8, 'big'))
+    digest.update(b'\x01' if enhance else b'\x00')
+    # Pipeline settings, so changing them invalidates every entry
+    digest.update(len(signature).to_bytes(8, 'big'))
+    digest.update(signature)
+    cache_path = os.path.join(cache_dir, digest.hexdigest())
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    
+    payload = preprocess_image(image_path, enhance=enhance)
+    if isinstance(payload, mmap.mmap):
+        return payload
+    
+    # Best-effort write via a temp file, so a concurrent reader never sees a partial entry
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+    return payload
+
+
 def format_error_message(error: Exception) -> str:
     """
     Format error message for display
@@ -171,8 +311,6 @@ def export_to_csv(results: List[Dict], output_file: str) -> None:
         results: List of result dictionaries
         output_file: Path to save CSV file
     """
-    import os
-    
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['Image Name', 'Raw Output (All Detected Words)', 'Number Plates', 'Confidence Score']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -5,13 +5,66 @@ Test script to process only the first N images from the vehicle folder
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
 from src.main import NumberPlateExtractor
-from src.utils import get_image_files, print_results_table, print_batch_results_json
+from src.utils import get_image_files, print_results_table, print_batch_results_json, to_json_bytes
+
+# Concurrent images; DetectDocumentText's default quota is 10 TPS per region
+MAX_WORKERS = 10
+
+
+def print_result_details(result: dict, json_output: bool = False):
+    """
+    Print the detailed result of one image
+    
+    Args:
+        result: Result dictionary from NumberPlateExtractor.process_image
+        json_output: Output as JSON
+    """
+    if json_output:
+        print(f"\n{result['image']}:")
+        if result['success']:
+            output = {
+                'plates': result['plates'],
+                'all_detected_text': result.get('all_detected_text', [])
+            }
+            print(to_json_bytes(output).decode('utf-8'))
+        else:
+            print(f"  Error: {result['error']}")
+        return
+    
+    print(f"\n{'='*80}")
+    print(f"IMAGE: {result['image']}")
+    print(f"{'='*80}")
+    if result['success']:
+        # Show plates
+        print("\n📍 DETECTED PLATES:")
+        print("-" * 80)
+        if result['plates']:
+            print_results_table(result['image'], result['plates'])
+        else:
+            print("No plates detected\n")
+        
+        # Show all detected text (raw text)
+        all_text = result.get('all_detected_text', [])
+        print("\n📝 ALL DETECTED TEXT (RAW):")
+        print("-" * 80)
+        if all_text:
+            # One write for the whole list instead of one per line
+            sys.stdout.write(''.join(
+                f"{idx}. Text: '{text_block['text']}' | Confidence: {text_block['confidence']}%\n"
+                for idx, text_block in enumerate(all_text, 1)
+            ))
+            sys.stdout.flush()
+        else:
+            print("No text detected\n")
+    else:
+        print(f"  Error: {result['error']}")
 
 
 def process_first_n_images(folder_path: str, n: int = 10, json_output: bool = False, output_file: str = None):
@@ -41,75 +94,49 @@ def process_first_n_images(folder_path: str, n: int = 10, json_output: bool = Fa
         # Initialize extractor
         extractor = NumberPlateExtractor(confidence=80.0)
         
-        # Process each image
+        # Process images concurrently (the Textract calls are network-bound);
+        # map() yields results in the same order as images_to_process, so each
+        # one is printed as soon as it and its predecessors are done. Results
+        # are only kept when they have to be saved.
         results = []
-        for image_path in images_to_process:
-            result = extractor.process_image(image_path, enhance=True)
-            results.append(result)
+        successful = 0
+        total_plates = 0
         
-        # Display results
         print("\n" + "="*80)
-        print("PROCESSING COMPLETE")
+        print("DETAILED RESULTS")
         print("="*80)
         
-        # Summary
-        successful = sum(1 for r in results if r['success'])
-        total_plates = sum(len(r.get('plates', [])) for r in results if r['success'])
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(images_to_process))) as executor:
+            for result in executor.map(
+                lambda image_path: extractor.process_image(image_path, enhance=True),
+                images_to_process
+            ):
+                if result['success']:
+                    successful += 1
+                    total_plates += len(result.get('plates', []))
+                # Workers are still writing progress lines under the same lock
+                with extractor.output_lock:
+                    print_result_details(result, json_output)
+                if output_file:
+                    results.append(result)
         
-        print(f"\nSummary:")
-        print(f"  Images processed: {len(results)}")
-        print(f"  Successful: {successful}")
-        print(f"  Failed: {len(results) - successful}")
-        print(f"  Total plates detected: {total_plates}")
+        processed = len(images_to_process)
         
-        # Detailed results
-        print(f"\n" + "="*80)
-        print("DETAILED RESULTS")
+        # Display summary
+        print("\n" + "="*80)
+        print("PROCESSING COMPLETE")
         print("="*80)
         
-        if json_output:
-            for result in results:
-                print(f"\n{result['image']}:")
-                if result['success']:
-                    import json
-                    output = {
-                        'plates': result['plates'],
-                        'all_detected_text': result.get('all_detected_text', [])
-                    }
-                    print(json.dumps(output, indent=2))
-                else:
-                    print(f"  Error: {result['error']}")
-        else:
-            for result in results:
-                print(f"\n{'='*80}")
-                print(f"IMAGE: {result['image']}")
-                print(f"{'='*80}")
-                if result['success']:
-                    # Show plates
-                    print("\n📍 DETECTED PLATES:")
-                    print("-" * 80)
-                    if result['plates']:
-                        print_results_table(result['image'], result['plates'])
-                    else:
-                        print("No plates detected\n")
-                    
-                    # Show all detected text (raw text)
-                    all_text = result.get('all_detected_text', [])
-                    print("\n📝 ALL DETECTED TEXT (RAW):")
-                    print("-" * 80)
-                    if all_text:
-                        for idx, text_block in enumerate(all_text, 1):
-                            print(f"{idx}. Text: '{text_block['text']}' | Confidence: {text_block['confidence']}%")
-                    else:
-                        print("No text detected\n")
-                else:
-                    print(f"  Error: {result['error']}")
+        print(f"\nSummary:")
+        print(f"  Images processed: {processed}")
+        print(f"  Successful: {successful}")
+        print(f"  Failed: {processed - successful}")
+        print(f"  Total plates detected: {total_plates}")
         
         # Save to file if requested
         if output_file:
-            import json
-            with open(output_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(to_json_bytes(results))
             print(f"\n✓ Results saved to: {output_file}")
     
     except Exception as e:
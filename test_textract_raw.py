@@ -8,15 +8,20 @@ with all blocks and metadata for debugging and analysis purposes.
 
 import sys
 import os
-import json
+import mmap
 import argparse
+from collections import Counter
 from pprint import pprint
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
-from image_preprocessor import preprocess_image, ImagePreprocessor
+from image_preprocessor import ImagePreprocessor
 from textract_client import get_textract_client
+from utils import cached_preprocess, to_json_bytes
+
+# With --output set, responses with more blocks than this are saved but not pretty-printed
+PPRINT_MAX_BLOCKS = 500
 
 
 def display_raw_response(image_path: str, enhance: bool = True, output_file: str = None):
@@ -46,13 +51,18 @@ def display_raw_response(image_path: str, enhance: bool = True, output_file: str
         
         # Preprocess image
         print("Processing image...")
-        image_bytes = preprocess_image(image_path, enhance=enhance)
+        image_bytes = cached_preprocess(image_path, enhance=enhance)
         print(f"✓ Image preprocessed ({len(image_bytes) / 1024:.2f} KB)")
         
         # Call Textract API
         print("\nCalling Textract API...")
         textract = get_textract_client()
-        response = textract.detect_document_text(image_bytes)
+        try:
+            response = textract.detect_document_text(image_bytes)
+        finally:
+            # Unenhanced images come back as a file mapping
+            if isinstance(image_bytes, mmap.mmap):
+                image_bytes.close()
         print("✓ Textract API call successful")
         
         # Display response statistics
@@ -60,10 +70,7 @@ def display_raw_response(image_path: str, enhance: bool = True, output_file: str
         print(f"\n📊 Response Statistics:")
         print(f"  - Total Blocks: {len(blocks)}")
         
-        block_types = {}
-        for block in blocks:
-            block_type = block.get('BlockType', 'UNKNOWN')
-            block_types[block_type] = block_types.get(block_type, 0) + 1
+        block_types = Counter(block.get('BlockType', 'UNKNOWN') for block in blocks)
         
         for block_type, count in sorted(block_types.items()):
             print(f"    - {block_type}: {count}")
@@ -76,12 +83,18 @@ def display_raw_response(image_path: str, enhance: bool = True, output_file: str
         print("\n" + "=" * 80)
         print("FULL RAW RESPONSE:")
         print("=" * 80 + "\n")
-        pprint(response, width=100)
+        if output_file and len(blocks) > PPRINT_MAX_BLOCKS:
+            print(f"({len(blocks)} blocks; see {output_file} for the full response)")
+        else:
+            pprint(response, width=100, stream=sys.stdout)
         
-        # Save to file if requested
+        # Save to file if requested (written to a temp file first, so an
+        # interrupted save never leaves a truncated JSON file behind)
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(response, f, indent=2, default=str)
+            tmp_file = output_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(to_json_bytes(response, default=str))
+            os.replace(tmp_file, output_file)
             print(f"\n✓ Response saved to: {output_file}")
         
         # Display individual blocks in detail
@@ -89,14 +102,19 @@ def display_raw_response(image_path: str, enhance: bool = True, output_file: str
         print("DETAILED BLOCK BREAKDOWN:")
         print("=" * 80 + "\n")
         
+        # Collect the breakdown and write it at once: one write instead of one per line
+        lines = []
         for idx, block in enumerate(blocks):
-            print(f"\n--- Block {idx} ---")
-            print(f"Type: {block.get('BlockType')}")
-            print(f"Text: {block.get('Text', 'N/A')}")
-            print(f"Confidence: {block.get('Confidence', 'N/A')}")
-            print(f"Geometry: {block.get('Geometry', {})}")
+            lines.append(f"\n--- Block {idx} ---")
+            lines.append(f"Type: {block.get('BlockType')}")
+            lines.append(f"Text: {block.get('Text', 'N/A')}")
+            lines.append(f"Confidence: {block.get('Confidence', 'N/A')}")
+            lines.append(f"Geometry: {block.get('Geometry', {})}")
             if 'Relationships' in block:
-                print(f"Relationships: {block.get('Relationships')}")
+                lines.append(f"Relationships: {block.get('Relationships')}")
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
     
     except ValueError as e:
         print(f"❌ Validation Error: {str(e)}")